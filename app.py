@@ -1,17 +1,27 @@
 from __future__ import annotations
 
+import hashlib
+import io
 import json
 import os
+import shutil
 import tempfile
 import zipfile
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import asdict, dataclass
-from io import BytesIO
+from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
 
 import streamlit as st
+from dotenv import load_dotenv
 
-from src.invoice_pipeline.pipeline import process_invoice_pdf
+try:
+    import orjson
+except ImportError:  # optional: stdlib json fallback
+    orjson = None
+
+from src.invoice_pipeline.pipeline import process_invoice_pdf, process_invoice_pdfs
+
+load_dotenv()
 
 
 @dataclass(frozen=True)
@@ -19,6 +29,11 @@ class _UiInvoice:
     filename: str
     result: dict
 
+    @cached_property
+    def payload(self) -> bytes:
+        """Download JSON, serialized once per invoice (instances live in session state across reruns)."""
+        return _dumps(self.result)
+
 
 def _has_llm_key() -> bool:
     return bool(os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY"))
@@ -36,18 +51,84 @@ def _result_metrics(result: dict) -> dict:
     }
 
 
-def _zip_results(invoices: list[_UiInvoice]) -> bytes:
-    buf = BytesIO()
-    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for inv in invoices:
-            stem = Path(inv.filename).stem
-            zf.writestr(
-                f"{stem}_structured.json",
-                json.dumps(inv.result, indent=2, ensure_ascii=False),
-            )
+def _dumps(result: dict) -> bytes:
+    """Pretty-printed UTF-8 JSON bytes for download (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(result, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _zip_results(entries: tuple[tuple[str, bytes], ...], compress: bool = False) -> bytes:
+    """Build the results ZIP from (filename, json_bytes) pairs. Cached, so reruns reuse the archive."""
+    buf = io.BytesIO()
+    # Small JSON payloads gain little from DEFLATE; storing keeps the download click cheap.
+    # When compression is requested, level 1 is far faster than the default for a similar ratio.
+    if compress:
+        zip_kwargs = {"compression": zipfile.ZIP_DEFLATED, "compresslevel": 1}
+    else:
+        zip_kwargs = {"compression": zipfile.ZIP_STORED}
+    with zipfile.ZipFile(buf, mode="w", **zip_kwargs) as zf:
+        for filename, payload in entries:
+            zf.writestr(f"{Path(filename).stem}_structured.json", payload)
     return buf.getvalue()
 
 
+def _upload_digest(up) -> str:
+    """Content hash of an upload, read in 1 MiB chunks."""
+    h = hashlib.blake2b(digest_size=20)
+    up.seek(0)
+    for chunk in iter(lambda: up.read(1024 * 1024), b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def _persist_upload(up, dest_dir: Path) -> Path:
+    """Stream an upload to dest_dir in 1 MiB chunks instead of copying the whole PDF into memory."""
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    pdf_path = dest_dir / up.name
+    up.seek(0)
+    with open(pdf_path, "wb") as f:
+        shutil.copyfileobj(up, f, length=1024 * 1024)
+    return pdf_path
+
+
+class _UncachedResult(Exception):
+    """Raised out of _run_pipeline so st.cache_data skips the entry; carries the result to return anyway."""
+
+    def __init__(self, result: dict) -> None:
+        super().__init__("result not cached")
+        self.result = result
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _run_pipeline(
+    digest: str,
+    filename: str,
+    llm_primary: bool,
+    llm_fallback: bool,
+    lookup_agent: bool,
+    _upload,
+) -> dict:
+    """
+    Run the pipeline on one upload. Cached on content digest + settings (`_upload` is not hashed).
+    When LLM primary extraction was requested but did not produce the result (e.g. a transient API error),
+    the fallback result is not cached, so the next click retries the LLM.
+    """
+    with tempfile.TemporaryDirectory() as td:
+        tmp_pdf = _persist_upload(_upload, Path(td))
+        r = process_invoice_pdf(
+            tmp_pdf,
+            use_lookup_agent=lookup_agent,
+            use_llm_fallback=llm_fallback,
+            use_llm_primary=llm_primary,
+        )
+    result = r.model_dump()
+    if llm_primary and r.raw_metadata.get("parser") != "llm_primary":
+        raise _UncachedResult(result)
+    return result
+
+
 st.set_page_config(
     page_title="Invoice Extraction UI",
     page_icon="🧾",
@@ -70,6 +151,7 @@ with st.sidebar:
     st.divider()
     st.subheader("Performance")
     num_workers = st.slider("Parallel workers", min_value=1, max_value=4, value=1, help="Number of invoices to process in parallel (1-4)")
+    compress_zip = st.toggle("Compress ZIP download", value=False, help="Smaller archive, slower to build")
 
     st.divider()
     st.subheader("LLM key status")
@@ -97,24 +179,19 @@ with col_b:
 
 if clear_btn:
     st.session_state.pop("ui_results", None)
+    _run_pipeline.clear()
     st.rerun()
 
 if run_btn and uploads:
     ui_results: list[_UiInvoice] = []
     
     def _process_one_pdf(up) -> _UiInvoice:
-        """Process a single uploaded PDF."""
-        with tempfile.TemporaryDirectory() as td:
-            tmp_dir = Path(td)
-            tmp_pdf = tmp_dir / up.name
-            tmp_pdf.write_bytes(up.getvalue())
-            r = process_invoice_pdf(
-                tmp_pdf,
-                use_lookup_agent=lookup_agent,
-                use_llm_fallback=llm_fallback,
-                use_llm_primary=llm_primary,
-            )
-            return _UiInvoice(filename=up.name, result=r.model_dump())
+        """Process a single uploaded PDF (re-runs on an identical file are served from cache)."""
+        try:
+            result = _run_pipeline(_upload_digest(up), up.name, llm_primary, llm_fallback, lookup_agent, up)
+        except _UncachedResult as e:
+            result = e.result
+        return _UiInvoice(filename=up.name, result=result)
     
     with st.spinner(f"Processing {len(uploads)} PDF(s) with {num_workers} worker(s)…"):
         if num_workers == 1:
@@ -122,42 +199,45 @@ if run_btn and uploads:
             for up in uploads:
                 ui_results.append(_process_one_pdf(up))
         else:
-            # Parallel processing - preserve upload order
-            results_dict: dict[int, _UiInvoice] = {}
-            with ThreadPoolExecutor(max_workers=num_workers) as executor:
-                future_to_idx = {executor.submit(_process_one_pdf, up): i for i, up in enumerate(uploads)}
-                for future in as_completed(future_to_idx):
-                    idx = future_to_idx[future]
-                    try:
-                        results_dict[idx] = future.result()
-                    except Exception as e:
-                        up = uploads[idx]
-                        error_result = _UiInvoice(
-                            filename=up.name,
-                            result={
-                                "source_file": up.name,
-                                "supplier_name": "Error",
-                                "line_items": [],
-                                "raw_metadata": {"error": str(e)},
-                            },
+            # Parallel batch: text extraction in worker processes, LLM extraction batched across uploads.
+            # Results come back in upload order.
+            with tempfile.TemporaryDirectory() as td:
+                pdf_paths = [_persist_upload(up, Path(td) / str(i)) for i, up in enumerate(uploads)]
+                try:
+                    batch = [
+                        r.model_dump()
+                        for r in process_invoice_pdfs(
+                            pdf_paths,
+                            use_lookup_agent=lookup_agent,
+                            use_llm_fallback=llm_fallback,
+                            use_llm_primary=llm_primary,
+                            max_workers=num_workers,
                         )
-                        results_dict[idx] = error_result
-            # Sort by index to preserve upload order
-            ui_results = [results_dict[i] for i in sorted(results_dict.keys())]
-
-    st.session_state["ui_results"] = [asdict(x) for x in ui_results]
-
-raw = st.session_state.get("ui_results") or []
-results: list[_UiInvoice] = [_UiInvoice(**x) for x in raw]  # type: ignore[arg-type]
+                    ]
+                except Exception as e:
+                    batch = [
+                        {
+                            "source_file": up.name,
+                            "supplier_name": "Error",
+                            "line_items": [],
+                            "raw_metadata": {"error": str(e)},
+                        }
+                        for up in uploads
+                    ]
+            ui_results = [_UiInvoice(filename=up.name, result=r) for up, r in zip(uploads, batch)]
+
+    # Frozen dataclasses are safe to keep in session state as-is; no per-rerun rehydration
+    st.session_state["ui_results"] = ui_results
+
+results: list[_UiInvoice] = st.session_state.get("ui_results") or []
 
 if not results:
     st.info("Upload PDFs and click **Process invoices** to see results.")
     st.stop()
 
-zip_bytes = _zip_results(results)
 st.download_button(
     "Download all JSON (zip)",
-    data=zip_bytes,
+    data=_zip_results(tuple((r.filename, r.payload) for r in results), compress=compress_zip),
     file_name="invoice_structured_outputs.zip",
     mime="application/zip",
 )
@@ -195,7 +275,7 @@ for tab, inv in zip(tabs, results, strict=False):
 
         st.download_button(
             "Download this invoice JSON",
-            data=json.dumps(inv.result, indent=2, ensure_ascii=False).encode("utf-8"),
+            data=inv.payload,
             file_name=f"{Path(inv.filename).stem}_structured.json",
             mime="application/json",
             key=f"dl_{inv.filename}",
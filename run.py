@@ -7,6 +7,7 @@ Usage:
   python run.py --input Invoices --output ./output
   python run.py --input ./input --no-lookup-agent   # Skip agentic UOM lookup
   python run.py --input ./input --no-llm-fallback   # Skip LLM extraction fallback
+  python run.py --input ./input -j 4 --parallel-mode thread   # 4 PDFs at a time on threads (LLM-bound runs)
 
 Drop PDFs into the input folder and run to generate structured JSON per invoice.
 """
@@ -59,6 +60,12 @@ def main() -> None:
         metavar="N",
         help="Process N PDFs in parallel (default: 1)",
     )
+    parser.add_argument(
+        "--parallel-mode",
+        choices=["process", "thread"],
+        default="process",
+        help="Parallelize with worker processes (CPU-bound parsing) or threads (LLM-bound runs) (default: process)",
+    )
     args = parser.parse_args()
 
     input_path = Path(args.input)
@@ -76,6 +83,7 @@ def main() -> None:
         use_llm_fallback=not args.no_llm_fallback,
         use_llm_primary=not args.no_llm_primary,
         max_workers=max(1, args.parallel),
+        parallel_mode=args.parallel_mode,
     )
 
     total_items = sum(len(r.line_items) for r in results)
@@ -2,7 +2,7 @@
 Invoice processing pipeline: PDF ingestion -> extraction -> UOM normalization -> structured JSON output.
 """
 
-from .pipeline import process_invoice_pdf, run_on_folder
+from .pipeline import process_invoice_pdf, process_invoice_pdfs, run_on_folder
 from .models import LineItemOutput, InvoiceResult
 
-__all__ = ["process_invoice_pdf", "run_on_folder", "LineItemOutput", "InvoiceResult"]
+__all__ = ["process_invoice_pdf", "process_invoice_pdfs", "run_on_folder", "LineItemOutput", "InvoiceResult"]
@@ -1,5 +1,6 @@
 """
 Shared OpenAI API client. Lazily initialized and reused across extraction and lookup.
+Async clients (for concurrent LLM calls) are created per event loop.
 """
 from __future__ import annotations
 
@@ -13,15 +14,36 @@ load_dotenv()
 _client: Optional["OpenAI"] = None
 
 
+def _client_kwargs() -> Optional[dict]:
+    """api_key / base_url for OpenRouter (preferred) or OpenAI, or None if no API key."""
+    api_key = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    base_url = "https://openrouter.ai/api/v1" if os.getenv("OPENROUTER_API_KEY") else None
+    return {"api_key": api_key, "base_url": base_url} if base_url else {"api_key": api_key}
+
+
 def get_openai_client() -> Optional["OpenAI"]:
     """Return shared OpenAI client, or None if no API key."""
     global _client
     if _client is not None:
         return _client
-    api_key = os.getenv("OPENROUTER_API_KEY") or os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    kwargs = _client_kwargs()
+    if kwargs is None:
         return None
     from openai import OpenAI
-    base_url = "https://openrouter.ai/api/v1" if os.getenv("OPENROUTER_API_KEY") else None
-    _client = OpenAI(api_key=api_key, base_url=base_url) if base_url else OpenAI(api_key=api_key)
+    _client = OpenAI(**kwargs)
     return _client
+
+
+def get_async_openai_client() -> Optional["AsyncOpenAI"]:
+    """
+    Return a new AsyncOpenAI client, or None if no API key.
+    Not cached: its connection pool is bound to the event loop that first uses it,
+    so the caller owns the client for the duration of one asyncio.run() and closes it.
+    """
+    kwargs = _client_kwargs()
+    if kwargs is None:
+        return None
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(**kwargs)
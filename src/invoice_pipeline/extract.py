@@ -1,35 +1,87 @@
 """
 PDF text extraction with OCR fallback for scanned documents.
-Uses pdfplumber for native text + tables; falls back to pytesseract if text is sparse.
+Uses PyMuPDF for native text + tables, pdfplumber when that comes back sparse,
+and falls back to pytesseract if text is still sparse.
 """
 from __future__ import annotations
 
 import re
 from pathlib import Path
 
-import pdfplumber
+# Runs of 3+ identical chars (OCR noise like MMMaaagggiiiddd)
+_OCR_RUN_RE = re.compile(r"(.)\1{2,}")
 
 
 def _has_sufficient_text(text: str | None, min_chars: int = 100) -> bool:
     """Heuristic: native extraction likely sufficient if we got enough text."""
-    if not text or not text.strip():
+    if not text:
         return False
-    cleaned = re.sub(r"(.)\1{2,}", r"\1", text)
-    return len(cleaned.strip()) >= min_chars
+    s = text.strip()
+    n = len(s)
+    # Plenty of native text: skip the OCR-noise scan, it can only matter for marginal cases
+    if n >= min_chars * 2:
+        return True
+    if n == 0:
+        return False
+    return len(_OCR_RUN_RE.sub(r"\1", s)) >= min_chars
+
+
+def _row_to_str(row: list) -> str:
+    """Pipe-join one table row; "" when every cell is blank (joining alone would still leave the pipes)."""
+    cells = [str(cell or "").strip() for cell in row]
+    return " | ".join(cells) if any(cells) else ""
 
 
 def _tables_to_text(tables: list) -> str:
     """Convert extracted tables to readable text lines for LLM consumption."""
-    lines: list[str] = []
-    for table in tables:
-        if not table:
-            continue
-        for row in table:
-            if row and any(cell is not None and str(cell).strip() for cell in row):
-                row_str = " | ".join(str(cell or "").strip() for cell in row)
-                if row_str.strip():
-                    lines.append(row_str)
-    return "\n".join(lines) if lines else ""
+    return "\n".join(s for table in tables if table for s in map(_row_to_str, (r for r in table if r)) if s)
+
+
+def _combine_text_and_tables(text_parts: list[str], table_parts: list[str]) -> str:
+    """Full page text first (headers, vendor), then table data."""
+    all_text = "\n\n".join(text_parts) if text_parts else ""
+    table_text = "\n\n".join(table_parts) if table_parts else ""
+    if table_text and table_text not in all_text:
+        all_text = all_text + "\n\n--- LINE ITEM TABLE ---\n\n" + table_text
+    return all_text or ""
+
+
+def _page_rows_text(page, y_tolerance: float = 3.0) -> str:
+    """
+    Rebuild visual rows from PyMuPDF word boxes (like pdfplumber's extract_text).
+    Plain get_text("text") emits each table cell on its own line, which breaks the row-based parser.
+    """
+    words = sorted(page.get_text("words"), key=lambda w: (w[1], w[0]))
+    rows: list[list] = []
+    row_top: float | None = None
+    for w in words:
+        if row_top is None or abs(w[1] - row_top) > y_tolerance:
+            rows.append([])
+            row_top = w[1]
+        rows[-1].append(w)
+    return "\n".join(" ".join(w[4] for w in sorted(row, key=lambda w: w[0])) for row in rows)
+
+
+def _extract_with_pymupdf(path: Path) -> str:
+    """Extract page text + table contents with PyMuPDF (C-backed; much faster than pdfplumber)."""
+    text_parts: list[str] = []
+    table_parts: list[str] = []
+    try:
+        import pymupdf
+
+        with pymupdf.open(path) as doc:
+            for page in doc:
+                t = _page_rows_text(page)
+                if t:
+                    text_parts.append(t)
+                tables = [tb.extract() for tb in page.find_tables().tables]
+                if tables:
+                    table_parts.append(_tables_to_text(tables))
+    except ImportError:
+        return ""
+    except Exception:
+        pass
+    return _combine_text_and_tables(text_parts, table_parts)
 
 
 def _extract_with_pdfplumber(path: Path) -> str:
@@ -37,6 +89,8 @@ def _extract_with_pdfplumber(path: Path) -> str:
     text_parts: list[str] = []
     table_parts: list[str] = []
     try:
+        import pdfplumber
+
         with pdfplumber.open(path) as pdf:
             for page in pdf.pages:
                 t = page.extract_text()
@@ -47,12 +101,7 @@ def _extract_with_pdfplumber(path: Path) -> str:
                     table_parts.append(_tables_to_text(tables))
     except Exception:
         pass
-    # Combine: full page text first (headers, vendor), then table data
-    all_text = "\n\n".join(text_parts) if text_parts else ""
-    table_text = "\n\n".join(table_parts) if table_parts else ""
-    if table_text and table_text not in all_text:
-        all_text = all_text + "\n\n--- LINE ITEM TABLE ---\n\n" + table_text
-    return all_text or ""
+    return _combine_text_and_tables(text_parts, table_parts)
 
 
 def _extract_with_ocr(path: Path) -> str:
@@ -79,7 +128,11 @@ def extract_text_from_pdf(path: str | Path) -> str:
     if not path.exists() or path.suffix.lower() != ".pdf":
         return ""
 
-    text = _extract_with_pdfplumber(path)
+    text = _extract_with_pymupdf(path)
+    if not _has_sufficient_text(text):
+        plumber_text = _extract_with_pdfplumber(path)
+        if _has_sufficient_text(plumber_text) or len(plumber_text) > len(text):
+            text = plumber_text
     if not _has_sufficient_text(text):
         ocr_text = _extract_with_ocr(path)
         if ocr_text:
@@ -4,35 +4,32 @@ Primary extraction path for high-quality structured output.
 """
 from __future__ import annotations
 
+import asyncio
 import json
-import os
 import re
+from functools import lru_cache
 from typing import Optional
 
-from dotenv import load_dotenv
-
 from .models import RawLineItem
 
-load_dotenv()
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a character budget
+    tiktoken = None
 
+# Prompt budget per invoice: ~3500 tokens, or 12000 characters without tiktoken
+_MAX_TEXT_CHARS = 12000
+_MAX_TEXT_TOKENS = 3500
 
-def extract_all_via_llm(
-    text: str,
-    hint_supplier: Optional[str] = None,
-) -> tuple[str, list[RawLineItem]]:
-    """
-    Use LLM to extract supplier name and all line items from raw invoice text.
-    Returns (supplier_name, raw_line_items).
-    Produces clean item descriptions and MPN as in the target schema.
-    """
-    from .api_client import get_openai_client
-    client = get_openai_client()
-    if not client:
-        return hint_supplier or "Unknown Supplier", []
+# Output budget per invoice, the same for single and batched calls. gpt-4o-mini returns at most
+# 16384 output tokens, so one batch request holds at most 16384 // 8000 = 2 invoices.
+_EXTRACT_MAX_TOKENS = 8000
+_MODEL_MAX_OUTPUT_TOKENS = 16384
+_MAX_BATCH_SIZE = _MODEL_MAX_OUTPUT_TOKENS // _EXTRACT_MAX_TOKENS
 
-    try:
+_FENCE_RE = re.compile(r"```(?:json)?\s*")
 
-        system = """You are an expert invoice data extractor. Extract the supplier/vendor name and all line items from the raw invoice text.
+_SYS_EXTRACT = """You are an expert invoice data extractor. Extract the supplier/vendor name and all line items from the raw invoice text.
 
 RULES:
 1. supplier_name: The FULL legal/business name of the company that issued the invoice (e.g. "MSC Industrial Supply Co.", "ULINE", "Magid Glove and Safety Manufacturing", "Fastenal Company"). NOT addresses, NOT "Remit to", NOT P.O. Box. The vendor/supplier company name.
@@ -49,81 +46,293 @@ RULES:
 4. Skip header rows, totals, subtotals, tax lines. Only real product line items with prices.
 5. Handle OCR noise: ignore repeated characters (e.g. MMMaaagggiiiddd = Magid)."""
 
-        user = f"""Extract supplier and line items from this invoice.
-{f"Vendor hint from filename/headers: {hint_supplier}" if hint_supplier else ""}
-
-RAW INVOICE TEXT:
-{text[:12000]}
 
-Return a JSON object with this exact structure:
-{{
+# Static tail of the user prompts; only the invoice text in front of it changes per call
+_EXTRACT_RESPONSE_FORMAT = """Return a JSON object with this exact structure:
+{
   "supplier_name": "Full Legal Company Name",
   "line_items": [
-    {{
+    {
       "item_description": "Clean product description only",
       "manufacturer_part_number": "SKU or null",
       "quantity": 1,
       "original_uom": "EA",
       "unit_price": 1.99,
       "extended_price": 1.99
-    }}
+    }
   ]
-}}
+}
 
 Return ONLY the JSON object, no markdown, no explanation."""
 
+_BATCH_EXTRACT_RESPONSE_FORMAT = """Return a JSON array with one object per invoice:
+[
+  {
+    "idx": <idx from the DOC marker>,
+    "supplier_name": "Full Legal Company Name",
+    "line_items": [
+      {
+        "item_description": "Clean product description only",
+        "manufacturer_part_number": "SKU or null",
+        "quantity": 1,
+        "original_uom": "EA",
+        "unit_price": 1.99,
+        "extended_price": 1.99
+      }
+    ]
+  }
+]
+
+Return ONLY the JSON array, no markdown, no explanation."""
+
+
+def _parse_extraction(
+    data: dict,
+    hint_supplier: Optional[str],
+) -> tuple[str, list[RawLineItem]]:
+    """Turn one extraction JSON object into (supplier_name, raw_line_items)."""
+    supplier = str(data.get("supplier_name", hint_supplier or "Unknown Supplier")).strip()
+    if not supplier or supplier.lower() in ("unknown", "null", "n/a"):
+        supplier = hint_supplier or "Unknown Supplier"
+
+    items: list[RawLineItem] = []
+    for o in data.get("line_items") or []:
+        try:
+            desc = (o.get("item_description") or o.get("description") or "").strip()
+            if not desc:
+                continue
+            qty = float(o.get("quantity", 1))
+            unit = o.get("unit_price")
+            ext = o.get("extended_price")
+            if ext is None and unit is not None and qty:
+                ext = float(unit) * qty
+            elif unit is None and ext is not None and qty:
+                unit = float(ext) / qty
+            mpn = o.get("manufacturer_part_number") or o.get("manufacturer_part")
+            if mpn is not None and str(mpn).strip().lower() in ("null", "n/a", ""):
+                mpn = None
+            items.append(
+                RawLineItem(
+                    description=desc,
+                    item_number=mpn,
+                    manufacturer_part=mpn,
+                    quantity=qty,
+                    original_uom=o.get("original_uom"),
+                    unit_price=float(unit) if unit is not None else None,
+                    extended_price=float(ext) if ext is not None else None,
+                    line_confidence=0.85,
+                )
+            )
+        except (TypeError, ValueError):
+            continue
+
+    return supplier, items
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """gpt-4o-mini tokenizer, or None without tiktoken or its encoding files (e.g. offline first run)."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model("gpt-4o-mini")
+    except Exception:
+        return None
+
+
+def _truncate_text(text: str) -> str:
+    """Cap invoice text at the prompt budget, by token count when a tokenizer is available."""
+    if len(text) < _MAX_TEXT_CHARS:
+        return text
+    enc = _encoding()
+    if enc is None:
+        return text[:_MAX_TEXT_CHARS]
+    return enc.decode(enc.encode(text, disallowed_special=())[:_MAX_TEXT_TOKENS])
+
+
+def _extract_messages(text: str, hint_supplier: Optional[str]) -> list[dict]:
+    """Chat messages for single-invoice extraction."""
+    user = f"""Extract supplier and line items from this invoice.
+{f"Vendor hint from filename/headers: {hint_supplier}" if hint_supplier else ""}
+
+RAW INVOICE TEXT:
+{_truncate_text(text)}
+
+""" + _EXTRACT_RESPONSE_FORMAT
+    return [
+        {"role": "system", "content": _SYS_EXTRACT},
+        {"role": "user", "content": user},
+    ]
+
+
+def _batch_extract_messages(docs: list[tuple[int, str, Optional[str]]]) -> list[dict]:
+    """Chat messages for multi-invoice extraction. docs = [(idx, text, hint_supplier), ...]"""
+    doc_blocks = []
+    for idx, text, hint in docs:
+        hint_info = f"Vendor hint from filename/headers: {hint}\n" if hint else ""
+        doc_blocks.append(f"---DOC {idx}---\n{hint_info}RAW INVOICE TEXT:\n{_truncate_text(text)}")
+
+    user = f"""Extract supplier and line items from each of the {len(docs)} invoices below.
+Each invoice starts with a "---DOC <idx>---" marker. Treat every invoice independently.
+
+{chr(10).join(doc_blocks)}
+
+""" + _BATCH_EXTRACT_RESPONSE_FORMAT
+    return [
+        {"role": "system", "content": _SYS_EXTRACT},
+        {"role": "user", "content": user},
+    ]
+
+
+def _load_json_content(resp) -> object:
+    """JSON payload of a chat completion, tolerating markdown code fences."""
+    content = (resp.choices[0].message.content or "").strip()
+    if "```" in content:
+        content = _FENCE_RE.sub("", content).replace("```", "").strip()
+    return json.loads(content)
+
+
+def _parse_batch_extraction(
+    data: object,
+    docs: list[tuple[int, str, Optional[str]]],
+) -> dict[int, tuple[str, list[RawLineItem]]]:
+    """Map a batch response array to idx -> (supplier_name, raw_line_items) for the documents answered."""
+    arr = data if isinstance(data, list) else []
+    hints = {idx: hint for idx, _, hint in docs}
+    result: dict[int, tuple[str, list[RawLineItem]]] = {}
+    for o in arr:
+        try:
+            idx = int(o.get("idx"))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if idx in hints and idx not in result:
+            result[idx] = _parse_extraction(o, hints[idx])
+    return result
+
+
+def extract_all_via_llm(
+    text: str,
+    hint_supplier: Optional[str] = None,
+) -> tuple[str, list[RawLineItem]]:
+    """
+    Use LLM to extract supplier name and all line items from raw invoice text.
+    Returns (supplier_name, raw_line_items).
+    Produces clean item descriptions and MPN as in the target schema.
+    """
+    from .api_client import get_openai_client
+    client = get_openai_client()
+    if not client:
+        return hint_supplier or "Unknown Supplier", []
+
+    try:
         resp = client.chat.completions.create(
             model="openai/gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
+            messages=_extract_messages(text, hint_supplier),
             temperature=0.1,
-            max_tokens=8000,
+            max_tokens=_EXTRACT_MAX_TOKENS,
         )
-        content = (resp.choices[0].message.content or "").strip()
-        if "```" in content:
-            content = re.sub(r"```(?:json)?\s*", "", content).replace("```", "").strip()
-        data = json.loads(content)
-
-        supplier = str(data.get("supplier_name", hint_supplier or "Unknown Supplier")).strip()
-        if not supplier or supplier.lower() in ("unknown", "null", "n/a"):
-            supplier = hint_supplier or "Unknown Supplier"
-
-        items: list[RawLineItem] = []
-        for o in data.get("line_items") or []:
-            try:
-                desc = (o.get("item_description") or o.get("description") or "").strip()
-                if not desc:
-                    continue
-                qty = float(o.get("quantity", 1))
-                unit = o.get("unit_price")
-                ext = o.get("extended_price")
-                if ext is None and unit is not None and qty:
-                    ext = float(unit) * qty
-                elif unit is None and ext is not None and qty:
-                    unit = float(ext) / qty
-                mpn = o.get("manufacturer_part_number") or o.get("manufacturer_part")
-                if mpn is not None and str(mpn).strip().lower() in ("null", "n/a", ""):
-                    mpn = None
-                items.append(
-                    RawLineItem(
-                        description=desc,
-                        item_number=mpn,
-                        manufacturer_part=mpn,
-                        quantity=qty,
-                        original_uom=o.get("original_uom"),
-                        unit_price=float(unit) if unit is not None else None,
-                        extended_price=float(ext) if ext is not None else None,
-                        line_confidence=0.85,
-                    )
-                )
-            except (TypeError, ValueError):
-                continue
+        return _parse_extraction(_load_json_content(resp), hint_supplier)
+    except Exception:
+        return hint_supplier or "Unknown Supplier", []
 
-        return supplier, items
+
+async def extract_all_via_llm_async(
+    text: str,
+    hint_supplier: Optional[str] = None,
+    client: Optional["AsyncOpenAI"] = None,
+) -> tuple[str, list[RawLineItem]]:
+    """
+    Async extract_all_via_llm. Pass an AsyncOpenAI client to share its connection pool across calls;
+    without one, a client is created and closed for this call.
+    """
+    from .api_client import get_async_openai_client
+    owns_client = client is None
+    if owns_client:
+        client = get_async_openai_client()
+        if not client:
+            return hint_supplier or "Unknown Supplier", []
+
+    try:
+        resp = await client.chat.completions.create(
+            model="openai/gpt-4o-mini",
+            messages=_extract_messages(text, hint_supplier),
+            temperature=0.1,
+            max_tokens=_EXTRACT_MAX_TOKENS,
+        )
+        return _parse_extraction(_load_json_content(resp), hint_supplier)
     except Exception:
         return hint_supplier or "Unknown Supplier", []
+    finally:
+        if owns_client:
+            await client.close()
+
+
+async def _batch_call_llm_for_extraction(
+    client: "AsyncOpenAI",
+    docs: list[tuple[int, str, Optional[str]]],
+) -> dict[int, tuple[str, list[RawLineItem]]]:
+    """
+    One LLM call for several invoices. docs = [(idx, text, hint_supplier), ...]
+    Returns dict idx -> (supplier_name, raw_line_items) for the documents the model answered.
+    """
+    try:
+        resp = await client.chat.completions.create(
+            model="openai/gpt-4o-mini",
+            messages=_batch_extract_messages(docs),
+            temperature=0.1,
+            max_tokens=_EXTRACT_MAX_TOKENS * len(docs),
+        )
+        return _parse_batch_extraction(_load_json_content(resp), docs)
+    except Exception:
+        return {}
+
+
+async def _extract_all_via_llm_batch_async(
+    texts: list[str],
+    hints: list[Optional[str]],
+    batch_size: int,
+) -> list[tuple[str, list[RawLineItem]]]:
+    from .api_client import get_async_openai_client
+    client = get_async_openai_client()
+    if not client:
+        return [(hint or "Unknown Supplier", []) for hint in hints]
+
+    results: list[Optional[tuple[str, list[RawLineItem]]]] = [None] * len(texts)
+    async with client:
+        batches = [
+            [(i, texts[i], hints[i]) for i in range(start, min(start + batch_size, len(texts)))]
+            for start in range(0, len(texts), batch_size)
+        ]
+        multi = [docs for docs in batches if len(docs) > 1]
+        for answered in await asyncio.gather(*(_batch_call_llm_for_extraction(client, docs) for docs in multi)):
+            for idx, extraction in answered.items():
+                results[idx] = extraction
+
+        missing = [i for i, r in enumerate(results) if r is None]
+        singles = await asyncio.gather(
+            *(extract_all_via_llm_async(texts[i], hints[i], client=client) for i in missing)
+        )
+        for i, extraction in zip(missing, singles):
+            results[i] = extraction
+    return results  # type: ignore[return-value]
+
+
+def extract_all_via_llm_batch(
+    texts: list[str],
+    hints: list[Optional[str]],
+    batch_size: int = _MAX_BATCH_SIZE,
+) -> list[tuple[str, list[RawLineItem]]]:
+    """
+    Batched extract_all_via_llm: up to batch_size invoices share one LLM call (and its system prompt).
+    batch_size is capped at _MAX_BATCH_SIZE so every invoice keeps the single-call output budget.
+    All batch requests run concurrently on one event loop, so wall time is ~one round trip.
+    Returns (supplier_name, raw_line_items) per text, in input order.
+    Documents missing from a batch response (or a failed batch) fall back to a per-document call.
+    Must not be called from inside a running event loop (use extract_all_via_llm_async there).
+    """
+    if not texts:
+        return []
+    return asyncio.run(_extract_all_via_llm_batch_async(texts, hints, min(max(1, batch_size), _MAX_BATCH_SIZE)))
 
 
 def extract_line_items_via_llm(
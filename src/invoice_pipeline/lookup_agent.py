@@ -11,9 +11,37 @@ import re
 from dataclasses import dataclass
 from typing import Optional
 
-from dotenv import load_dotenv
+from .uom import UOM_COUNT, UOM_EA_SAFE, UOM_PACK_CONTAINER, is_measurable_uom
 
-load_dotenv()
+# UOMs that (subject to a description check) never need a lookup; screened before any regex
+_PAIR_UOM = frozenset({"PR", "PAIR"})
+_DOZEN_UOM = frozenset({"DZ", "DOZEN"})
+_NO_LOOKUP_UOM = UOM_EA_SAFE | _PAIR_UOM | _DOZEN_UOM
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*")
+_PACK_SLASH_RE = re.compile(r"\d+\s*/\s*")
+_PACK_PK_RE = re.compile(r"PK\s*\d+|\d+\s*PR", re.I)
+
+_SYS_UOM = """You are a UOM inference assistant. Given an invoice line item description, infer ONLY the unit of measure and pack quantity if clearly indicated in the description.
+
+RULES:
+- Output ONLY valid JSON: {"canonical_uom": "EA", "detected_pack_quantity": <int or null>, "confidence": <0.0-1.0>, "escalation": <bool>}
+- canonical_uom: always "EA" (each) - we normalize everything to base units
+- detected_pack_quantity: ONLY if explicitly in the description (e.g. "100/DP" -> 100, "25/CS" -> 25, "PK10" -> 10). If uncertain, use null.
+- NEVER invent or guess MPN, SKU, or pack sizes not in the description.
+- confidence: 0.9+ only if pack/UOM is explicit in text; 0.5-0.7 if inferred from product type; 0.3 if very uncertain.
+- escalation: true if confidence < 0.6 or if you had to guess."""
+
+_SYS_UOM_BATCH = """You infer UOM and pack from invoice line descriptions. Output a JSON array of objects.
+Each: {"canonical_uom": "EA", "detected_pack_quantity": int|null, "confidence": float, "escalation": bool}"""
+
+_UOM_BATCH_INSTRUCTIONS = """Return a JSON array with one object per item, in the SAME ORDER as above. Each object:
+{"canonical_uom": "EA", "detected_pack_quantity": <int or null>, "confidence": <0.0-1.0>, "escalation": <bool>}
+
+RULES:
+- detected_pack_quantity: ONLY if explicitly in description (e.g. "100/DP" -> 100, "25/CS" -> 25). Null if uncertain.
+- NEVER invent pack sizes. escalation: true if confidence < 0.6.
+- Output ONLY the JSON array."""
 
 
 @dataclass
@@ -43,23 +71,21 @@ def should_trigger_lookup(
     - Description suggests pack info but we couldn't parse it
     Never trigger for measurable UOMs (LB, GAL, FT, etc.) - those escalate directly.
     """
-    from .uom import is_measurable_uom, UOM_PACK_CONTAINER, UOM_COUNT
-
-    if is_measurable_uom(original_uom):
-        return False  # Escalate, don't lookup
-    raw = (original_uom or "").strip().upper()
-    desc = (description or "").strip()
-
     # Have clear UOM and pack -> no lookup
     if pack_from_parsing is not None and pack_from_parsing > 0:
         return False
-    from .uom import UOM_EA_SAFE
-    if raw in UOM_EA_SAFE and not any(c in desc.upper() for c in ["/", "PK", "PER"]):
-        return False
-    if raw in ("PR", "PAIR") and pack_from_parsing is None and "/" not in desc:
-        return False
-    if raw in ("DZ", "DOZEN"):
-        return False
+    raw = (original_uom or "").strip().upper()
+    if raw in _NO_LOOKUP_UOM:
+        desc_u = (description or "").upper()
+        if raw in _DOZEN_UOM:
+            return False
+        if raw in UOM_EA_SAFE:
+            if not any(c in desc_u for c in ("/", "PK", "PER")):
+                return False
+        elif pack_from_parsing is None and "/" not in desc_u:
+            return False
+    if is_measurable_uom(original_uom):
+        return False  # Escalate, don't lookup
 
     # Trigger: missing UOM
     if not raw:
@@ -68,7 +94,8 @@ def should_trigger_lookup(
     if raw in UOM_PACK_CONTAINER or raw in UOM_COUNT:
         return pack_from_parsing is None
     # Trigger: ambiguous - numbers or / in description suggest pack
-    if re.search(r"\d+\s*/\s*", desc) or re.search(r"PK\s*\d+|\d+\s*PR", desc, re.I):
+    desc = description or ""
+    if _PACK_SLASH_RE.search(desc) or _PACK_PK_RE.search(desc):
         return pack_from_parsing is None
 
     return False
@@ -94,17 +121,6 @@ def _call_llm_for_uom(
         )
 
     try:
-
-        system = """You are a UOM inference assistant. Given an invoice line item description, infer ONLY the unit of measure and pack quantity if clearly indicated in the description.
-
-RULES:
-- Output ONLY valid JSON: {"canonical_uom": "EA", "detected_pack_quantity": <int or null>, "confidence": <0.0-1.0>, "escalation": <bool>}
-- canonical_uom: always "EA" (each) - we normalize everything to base units
-- detected_pack_quantity: ONLY if explicitly in the description (e.g. "100/DP" -> 100, "25/CS" -> 25, "PK10" -> 10). If uncertain, use null.
-- NEVER invent or guess MPN, SKU, or pack sizes not in the description.
-- confidence: 0.9+ only if pack/UOM is explicit in text; 0.5-0.7 if inferred from product type; 0.3 if very uncertain.
-- escalation: true if confidence < 0.6 or if you had to guess."""
-
         desc_snippet = (description or "")[:500]
         item_info = f"Item/SKU: {item_number}" if item_number else ""
         supplier_info = f"Supplier: {supplier_name}" if supplier_name else ""
@@ -120,7 +136,7 @@ Return ONLY the JSON object, no other text."""
         resp = client.chat.completions.create(
             model="openai/gpt-4o-mini",
             messages=[
-                {"role": "system", "content": system},
+                {"role": "system", "content": _SYS_UOM},
                 {"role": "user", "content": user},
             ],
             temperature=0.1,
@@ -129,7 +145,7 @@ Return ONLY the JSON object, no other text."""
         content = (resp.choices[0].message.content or "").strip()
         # Extract JSON from response
         if "```" in content:
-            content = re.sub(r"```(?:json)?\s*", "", content).replace("```", "").strip()
+            content = _FENCE_RE.sub("", content).replace("```", "").strip()
         data = json.loads(content)
 
         return LookupResult(
@@ -196,22 +212,13 @@ def _batch_call_llm_for_uom(
 Items (format "idx: description"):
 {chr(10).join(lines_text)}
 
-Return a JSON array with one object per item, in the SAME ORDER as above. Each object:
-{{"canonical_uom": "EA", "detected_pack_quantity": <int or null>, "confidence": <0.0-1.0>, "escalation": <bool>}}
-
-RULES:
-- detected_pack_quantity: ONLY if explicitly in description (e.g. "100/DP" -> 100, "25/CS" -> 25). Null if uncertain.
-- NEVER invent pack sizes. escalation: true if confidence < 0.6.
-- Output ONLY the JSON array."""
-
-    system = """You infer UOM and pack from invoice line descriptions. Output a JSON array of objects.
-Each: {"canonical_uom": "EA", "detected_pack_quantity": int|null, "confidence": float, "escalation": bool}"""
+""" + _UOM_BATCH_INSTRUCTIONS
 
     try:
         resp = client.chat.completions.create(
             model="openai/gpt-4o-mini",
             messages=[
-                {"role": "system", "content": system},
+                {"role": "system", "content": _SYS_UOM_BATCH},
                 {"role": "user", "content": user},
             ],
             temperature=0.1,
@@ -219,7 +226,7 @@ Each: {"canonical_uom": "EA", "detected_pack_quantity": int|null, "confidence":
         )
         content = (resp.choices[0].message.content or "").strip()
         if "```" in content:
-            content = re.sub(r"```(?:json)?\s*", "", content).replace("```", "").strip()
+            content = _FENCE_RE.sub("", content).replace("```", "").strip()
         data = json.loads(content)
         arr = data if isinstance(data, list) else []
         result: dict[int, LookupResult] = {}
@@ -252,32 +259,35 @@ def resolve_uom_agent_batch(
     raw_items: list,
     supplier_name: str,
     use_lookup_agent: bool,
-) -> dict[int, LookupResult]:
+) -> list[Optional[LookupResult]]:
     """
     Batch UOM resolution. Collects lines needing lookup, resolves deterministic first,
-    then one LLM call for the rest. Returns dict line_index -> LookupResult.
+    then one LLM call for the rest. Returns one LookupResult (or None: no lookup) per raw item, by position.
     """
     from .uom import parse_pack_from_text
 
+    results: list[Optional[LookupResult]] = [None] * len(raw_items)
+    if not use_lookup_agent:
+        return results
+
     need_llm: list[tuple[int, str, Optional[str], Optional[str]]] = []
-    results: dict[int, LookupResult] = {}
 
     for i, raw in enumerate(raw_items):
         desc = raw.description or ""
         original_uom = raw.original_uom
         pack_from_desc = parse_pack_from_text(desc)
 
-        if not use_lookup_agent or not should_trigger_lookup(original_uom, pack_from_desc, desc):
+        if not should_trigger_lookup(original_uom, pack_from_desc, desc):
             continue
 
-        pack = parse_pack_from_description(desc)
-        if pack is not None:
-            results[i] = LookupResult("EA", pack, 0.85, False)
+        # Same deterministic parse as resolve_uom_agent; reuse it rather than re-parsing desc
+        if pack_from_desc is not None:
+            results[i] = LookupResult("EA", pack_from_desc, 0.85, False)
         else:
             need_llm.append((i, desc, raw.item_number or raw.manufacturer_part, original_uom))
 
     if need_llm:
-        batch_results = _batch_call_llm_for_uom(need_llm, supplier_name)
-        results.update(batch_results)
+        for idx, lookup in _batch_call_llm_for_uom(need_llm, supplier_name).items():
+            results[idx] = lookup
 
     return results
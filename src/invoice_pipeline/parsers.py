@@ -9,11 +9,28 @@ from typing import Optional
 
 from .models import RawLineItem
 
+_NONNUM_RE = re.compile(r"[^\d.\-]")
+_SKU1_RE = re.compile(r"^[A-Z0-9][A-Z0-9\-/.]*[A-Z0-9]$", re.I)
+_SKU2_RE = re.compile(r"^[A-Z0-9\-]+$", re.I)
+_PURE_NUM_RE = re.compile(r"^\d+\.?\d*$")
+_PRICE_TOKEN_RE = re.compile(r"^[\d,.\$]+$")
+_CENTS_RE = re.compile(r"\d+\.\d{2}")
+_NUM_TOKEN_RE = re.compile(r"[\d,]+\.?\d*")
+_INT_RE = re.compile(r"\b\d+\b")
+_DIGIT_RE = re.compile(r"\d")
+_SPLIT_COLS_RE = re.compile(r"\s{2,}|\t")
+# Strings float() accepts as a finite decimal number (same digit/underscore/exponent rules)
+_NUM_COL_RE = re.compile(r"[+-]?(?:\d+(?:_\d+)*(?:\.(?:\d+(?:_\d+)*)?)?|\.\d+(?:_\d+)*)(?:[eE][+-]?\d+(?:_\d+)*)?$")
+_COMMA_STRIP = str.maketrans("", "", ",")
+
 
 def _parse_float(s: str | None) -> Optional[float]:
     if not s:
         return None
-    s = re.sub(r"[^\d.\-]", "", str(s))
+    s = str(s)
+    # Plain "1,234.56" cells only need their commas dropped; anything else goes through the regex
+    plain = s.replace(",", "")
+    s = plain if plain.isascii() and plain.replace(".", "", 1).isdigit() else _NONNUM_RE.sub("", s)
     try:
         return float(s)
     except ValueError:
@@ -28,13 +45,25 @@ UOM_PATTERNS = [
 ]
 
 
+# One scan finds every whole-word UOM; UOM_PATTERNS order still decides which one wins
+_UOM_ALT = re.compile(r"\b(?:" + "|".join(map(re.escape, UOM_PATTERNS)) + r")\b")
+_UOM_RANK = {uom: i for i, uom in enumerate(UOM_PATTERNS)}
+
+# Header/footer lines: skipped unless they carry a price
+SKIP_KEYWORDS = [
+    "invoice", "page", "remit", "sold to", "ship to", "sub-total", "subtotal",
+    "total", "amount due", "please pay", "thank you", "customer order",
+]
+# "price per hundred" is covered by "per hundred"
+PRICE_PER_HUNDRED_MARKERS = ["per hundred", "price/hundred", "price / hundred"]
+
+
 def _extract_uom(text: str) -> Optional[str]:
     """Extract UOM from text, preferring word boundaries."""
-    text_upper = text.upper()
-    for uom in UOM_PATTERNS:
-        if re.search(rf"\b{re.escape(uom)}\b", text_upper):
-            return uom
-    return None
+    found = _UOM_ALT.findall(text.upper())
+    if not found:
+        return None
+    return found[0] if len(found) == 1 else min(found, key=_UOM_RANK.__getitem__)
 
 
 def _looks_like_sku(s: str) -> bool:
@@ -44,7 +73,7 @@ def _looks_like_sku(s: str) -> bool:
         return False
     if s.upper() in uom_only:
         return False
-    if re.match(r"^[A-Z0-9][A-Z0-9\-/.]*[A-Z0-9]$", s, re.I) or re.match(r"^[A-Z0-9\-]+$", s, re.I):
+    if _SKU1_RE.match(s) or _SKU2_RE.match(s):
         return True
     return False
 
@@ -52,46 +81,39 @@ def _looks_like_sku(s: str) -> bool:
 def _parse_line_item_from_parts(parts: list[str], is_price_per_hundred: bool = False) -> Optional[RawLineItem]:
     """Parse a list of column values into a RawLineItem."""
     # Find numeric columns from the end
-    decimals: list[tuple[int, float]] = []
-    integers: list[tuple[int, int]] = []
+    decimals: list[float] = []  # in column order
+    qty_candidates: list[int] = []  # whole numbers left of the last three columns
+    qty_limit = len(parts) - 3
     for i, p in enumerate(parts):
-        p_clean = p.replace(",", "").strip()
-        try:
-            v = float(p_clean)
-            if v == int(v) and 1 <= v <= 999999:
-                integers.append((i, int(v)))
-            if "." in p_clean and 0.001 <= v <= 999999:
-                decimals.append((i, v))
-        except ValueError:
-            pass
+        p_clean = p.translate(_COMMA_STRIP).strip()
+        # Most columns are words: reject them without raising ValueError in float()
+        if not _NUM_COL_RE.match(p_clean):
+            continue
+        v = float(p_clean)
+        if i < qty_limit and v.is_integer() and 1 <= v <= 999999:
+            qty_candidates.append(int(v))
+        if "." in p_clean and 0.001 <= v <= 999999:
+            decimals.append(v)
 
     if len(decimals) < 1:
         return None
 
     # For Price Per Hundred: last decimal = Amount (extended), second-to-last = Price/Hundred
     if is_price_per_hundred and len(decimals) >= 2:
-        decimals_by_pos = sorted(decimals, key=lambda x: x[0])
-        extended = decimals_by_pos[-1][1]
-        price_per_hundred = decimals_by_pos[-2][1]
+        extended = decimals[-1]
+        price_per_hundred = decimals[-2]
         unit_price = price_per_hundred / 100.0
     else:
-        # Standard: extended = largest decimal (line total), unit_price = other
-        decimals_sorted = sorted(decimals, key=lambda x: (-x[1], -x[0]))
-        extended = decimals_sorted[0][1]
-        unit_price = None
-        for _, v in decimals_sorted[1:]:
-            if 0.001 <= v <= 99999 and abs(v - extended) > 0.01:
-                unit_price = v
-                break
-        if unit_price is None:
-            unit_price = extended
+        # Standard: extended = largest decimal (line total), unit_price = largest other plausible price
+        extended = max(decimals)
+        unit_price = max(
+            (v for v in decimals if 0.001 <= v <= 99999 and abs(v - extended) > 0.01),
+            default=extended,
+        )
 
     # Quantity: integer before prices
-    qty = 1
-    for i, v in integers:
-        if i < len(parts) - 3 and v != int(extended) and v != int(unit_price):
-            qty = v
-            break
+    extended_int, unit_int = int(extended), int(unit_price)
+    qty = next((v for v in qty_candidates if v != extended_int and v != unit_int), 1)
 
     if is_price_per_hundred and len(decimals) < 2:
         unit_price = (unit_price or 0) / 100.0
@@ -107,20 +129,21 @@ def _parse_line_item_from_parts(parts: list[str], is_price_per_hundred: bool = F
     uom = None
     for i, p in enumerate(parts):
         p = p.strip()
-        if not p or re.match(r"^\d+\.?\d*$", p.replace(",", "")):
+        if not p or _PURE_NUM_RE.match(p.replace(",", "")):
             continue
-        if _extract_uom(p) and not uom:
+        if not uom:
             uom = _extract_uom(p)
-        if _looks_like_sku(p) and mpn is None and i < len(parts) - 3:
+        if mpn is None and i < len(parts) - 3 and _looks_like_sku(p):
             mpn = p
-        if len(p) > 2 and not re.match(r"^[\d,.\$]+$", p):
+        if len(p) > 2 and not _PRICE_TOKEN_RE.match(p):
             desc_parts.append(p)
 
-    desc = " ".join(desc_parts[:5]) if desc_parts else " ".join(p for p in parts[:4] if p.strip())
+    desc = " ".join(desc_parts[:5]) if desc_parts else " ".join(filter(None, (p.strip() for p in parts[:4])))
     if not uom:
         uom = _extract_uom(desc) or _extract_uom(" ".join(parts))
 
-    return RawLineItem(
+    # Fields are already typed and cleaned here, so skip pydantic validation
+    return RawLineItem.model_construct(
         description=desc[:200] if desc else "Item",
         item_number=mpn,
         manufacturer_part=mpn,
@@ -142,7 +165,8 @@ def _parse_line_space_separated(line: str, is_price_per_hundred: bool = False) -
 
 def _parse_line_pipe_separated(line: str, is_price_per_hundred: bool = False) -> Optional[RawLineItem]:
     """Parse line with pipe-separated columns (from table extraction)."""
-    parts = [p.strip() for p in line.split("|")]
+    # Columns are stripped where they are read in _parse_line_item_from_parts
+    parts = line.split("|")
     if len(parts) < 3:
         return None
     return _parse_line_item_from_parts(parts, is_price_per_hundred)
@@ -153,29 +177,25 @@ def extract_line_items(text: str) -> list[RawLineItem]:
     items: list[RawLineItem] = []
     seen: set[tuple[float, float]] = set()  # (qty, extended) dedup
 
-    skip_keywords = [
-        "invoice", "page", "remit", "sold to", "ship to", "sub-total", "subtotal",
-        "total", "amount due", "please pay", "thank you", "customer order",
-    ]
-    is_price_per_hundred = (
-        "price per hundred" in text.lower()
-        or "price/hundred" in text.lower()
-        or "price / hundred" in text.lower()
-        or "per hundred" in text.lower()
-    )
+    text_lower = text.lower()
+    is_price_per_hundred = any(m in text_lower for m in PRICE_PER_HUNDRED_MARKERS)
 
     lines = text.split("\n")
     for line in lines:
         line = line.strip()
         if not line or len(line) < 8:
             continue
+        # Every parse below needs a number: rulers and column-title rows stop here
+        if not _DIGIT_RE.search(line):
+            continue
         # Skip header-like lines (all caps short words, no meaningful numbers)
-        if any(kw in line.lower() for kw in skip_keywords):
-            if not re.search(r"\d+\.\d{2}", line):
+        line_lower = line.lower()
+        if any(kw in line_lower for kw in SKIP_KEYWORDS):
+            if not _CENTS_RE.search(line):
                 continue
         # Skip lines that look like column headers only
         words = line.split()
-        if len(words) <= 3 and not any(re.search(r"\d+\.\d{2}", w) for w in words):
+        if len(words) <= 3 and not any(_CENTS_RE.search(w) for w in words):
             continue
 
         parsed = None
@@ -186,7 +206,7 @@ def extract_line_items(text: str) -> list[RawLineItem]:
 
         # Fallback: original regex-based parse for lines that didn't match
         if parsed is None:
-            nums = re.findall(r"[\d,]+\.?\d*", line)
+            nums = _NUM_TOKEN_RE.findall(line)
             decimals = []
             for n in nums:
                 v = _parse_float(n)
@@ -196,7 +216,7 @@ def extract_line_items(text: str) -> list[RawLineItem]:
                 extended = max(decimals)
                 unit_price = next((d for d in decimals if d != extended and 0.001 <= d <= 99999), extended)
                 qty = 1
-                for n in re.findall(r"\b\d+\b", line):
+                for n in _INT_RE.findall(line):
                     v = int(n)
                     if 1 <= v <= 99999 and v != int(extended):
                         qty = v
@@ -204,10 +224,10 @@ def extract_line_items(text: str) -> list[RawLineItem]:
                 if is_price_per_hundred:
                     unit_price = unit_price / 100.0
                     extended = qty * unit_price
-                desc_parts = [p for p in re.split(r"\s{2,}|\t", line) if p and not re.match(r"^\d+\.?\d*$", p.replace(",", "")) and len(p) > 2]
+                desc_parts = [p for p in _SPLIT_COLS_RE.split(line) if p and not _PURE_NUM_RE.match(p.replace(",", "")) and len(p) > 2]
                 desc = " ".join(desc_parts[:4]) if desc_parts else line[:80]
                 uom = _extract_uom(line)
-                parsed = RawLineItem(
+                parsed = RawLineItem.model_construct(
                     description=desc[:200],
                     item_number=None,
                     manufacturer_part=None,
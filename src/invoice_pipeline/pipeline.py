@@ -4,9 +4,11 @@ When deterministic parsers return no items, falls back to generic parser then to
 """
 from __future__ import annotations
 
-import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
+from typing import Literal
 
 from .extract import extract_text_from_pdf
 from .supplier_detection import detect_supplier
@@ -14,18 +16,13 @@ from .parsers import extract_line_items
 from .uom import (
     normalize_uom,
     parse_pack_from_text,
-    price_per_base_unit,
-    is_measurable_uom,
+    price_per_base_unit_from_key,
+    uom_category,
+    UOM_CAT_MEASURABLE,
     UOM_PACK_CONTAINER,
 )
-from .lookup_agent import (
-    should_trigger_lookup,
-    resolve_uom_agent,
-    resolve_uom_agent_batch,
-    parse_pack_from_description,
-)
+from .lookup_agent import resolve_uom_agent_batch
 from .models import LineItemOutput, InvoiceResult
-from .llm_extract import extract_all_via_llm, extract_line_items_via_llm
 
 
 def process_invoice_pdf(
@@ -44,13 +41,32 @@ def process_invoice_pdf(
     text = extract_text_from_pdf(path)
     hint_supplier = detect_supplier(text)
 
+    # Primary: LLM extraction for high-quality supplier name, item description, MPN
+    llm_extraction = None
+    if use_llm_primary:
+        from .llm_extract import extract_all_via_llm
+        llm_extraction = extract_all_via_llm(text, hint_supplier)
+    return _build_invoice_result(path, text, hint_supplier, llm_extraction, use_lookup_agent, use_llm_fallback)
+
+
+def _build_invoice_result(
+    path: Path,
+    text: str,
+    hint_supplier: str,
+    llm_extraction: tuple[str, list] | None,
+    use_lookup_agent: bool,
+    use_llm_fallback: bool,
+) -> InvoiceResult:
+    """
+    Everything after text extraction: parser fallbacks, UOM lookup, normalization.
+    llm_extraction is the (supplier_name, raw_items) result of LLM primary extraction, or None if disabled.
+    """
     raw_items: list = []
     supplier_name = hint_supplier
     parser_used = "llm_primary"
 
-    # Primary: LLM extraction for high-quality supplier name, item description, MPN
-    if use_llm_primary:
-        supplier_name, raw_items = extract_all_via_llm(text, hint_supplier)
+    if llm_extraction is not None:
+        supplier_name, raw_items = llm_extraction
 
     # Fallback: generic parser if LLM returned nothing
     if len(raw_items) == 0:
@@ -59,6 +75,7 @@ def process_invoice_pdf(
         supplier_name = hint_supplier
 
         if len(raw_items) == 0 and use_llm_fallback:
+            from .llm_extract import extract_line_items_via_llm
             raw_items, supplier_name = extract_line_items_via_llm(text, supplier_name)
             if raw_items:
                 parser_used = "llm_fallback"
@@ -70,23 +87,25 @@ def process_invoice_pdf(
     for i, raw in enumerate(raw_items):
         desc = raw.description or ""
         original_uom = raw.original_uom
-        pack_from_desc = parse_pack_from_text(desc) or parse_pack_from_description(desc)
+        pack_from_desc = parse_pack_from_text(desc)
+        lookup = lookup_results[i]
+        # Category and multiplier resolved once for whichever pricing branch runs below
+        uom_cat, uom_mult, _ = uom_category(original_uom)
 
         # Measurable UOMs (LB, GAL, FT, etc.) - not convertible, escalate
-        if is_measurable_uom(original_uom):
+        if uom_cat == UOM_CAT_MEASURABLE:
             canonical_uom = "EA"
             pack_qty = None
             confidence = 0.3
             escalate = True
             price_per_ea = None
-        elif i in lookup_results:
-            lookup = lookup_results[i]
+        elif lookup is not None:
             canonical_uom = lookup.canonical_uom
             pack_qty = lookup.detected_pack_quantity
             confidence = lookup.confidence * raw.line_confidence
             escalate = lookup.escalation
-            price_per_ea, conversion_unsafe = price_per_base_unit(
-                raw.extended_price, raw.quantity, original_uom, pack_qty, convertible=True
+            price_per_ea, conversion_unsafe = price_per_base_unit_from_key(
+                raw.extended_price, raw.quantity, uom_cat, uom_mult, pack_qty, convertible=True
             )
             if conversion_unsafe:
                 escalate = True
@@ -100,10 +119,11 @@ def process_invoice_pdf(
             if canonical_uom == "EA" and pack_qty is None and raw_uom in UOM_PACK_CONTAINER:
                 escalate = True
 
-            price_per_ea, conversion_unsafe = price_per_base_unit(
+            price_per_ea, conversion_unsafe = price_per_base_unit_from_key(
                 raw.extended_price,
                 raw.quantity,
-                original_uom,
+                uom_cat,
+                uom_mult,
                 pack_qty,
                 convertible=convertible,
             )
@@ -135,6 +155,84 @@ def process_invoice_pdf(
     )
 
 
+def _error_result(path: Path, error: str) -> InvoiceResult:
+    """Placeholder result for a PDF that failed, so a batch keeps one result per input."""
+    return InvoiceResult(
+        source_file=path.name,
+        supplier_name="Error",
+        line_items=[],
+        raw_metadata={"error": error},
+    )
+
+
+def _extract_and_detect(path: Path) -> tuple[str, str, str | None]:
+    """(text, supplier hint, error) for one PDF. Module-level so process pools can pickle it."""
+    try:
+        text = extract_text_from_pdf(path)
+        return text, detect_supplier(text), None
+    except Exception as e:
+        return "", "", str(e)
+
+
+def _future_result_or_error(future) -> tuple[str, str, str | None]:
+    """Result of an _extract_and_detect future; pool failures (e.g. BrokenProcessPool) become an error marker."""
+    try:
+        return future.result()
+    except Exception as e:
+        return "", "", str(e) or type(e).__name__
+
+
+def process_invoice_pdfs(
+    pdf_paths: list[str | Path],
+    use_lookup_agent: bool = True,
+    use_llm_fallback: bool = True,
+    use_llm_primary: bool = True,
+    max_workers: int = 1,
+) -> list[InvoiceResult]:
+    """
+    Process several invoice PDFs as one batch; results are returned in input order.
+    Text extraction (pdfplumber / OCR, CPU-bound) runs in a process pool when max_workers > 1.
+    LLM primary extraction batches several invoices per request instead of one call per PDF.
+    """
+    paths = [Path(p) for p in pdf_paths]
+    if max_workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            futures = [executor.submit(_extract_and_detect, p) for p in paths]
+            # A broken pool fails every pending future; each one still maps to its own error result
+            extracted = [_future_result_or_error(f) for f in futures]
+    else:
+        extracted = [_extract_and_detect(p) for p in paths]
+    texts = [text for text, _, _ in extracted]
+    hints = [hint for _, hint, _ in extracted]
+    errors = [error for _, _, error in extracted]
+
+    llm_extractions: list = [None] * len(paths)
+    if use_llm_primary:
+        from .llm_extract import extract_all_via_llm_batch
+        ok = [i for i, error in enumerate(errors) if error is None]
+        for i, extraction in zip(ok, extract_all_via_llm_batch([texts[i] for i in ok], [hints[i] for i in ok])):
+            llm_extractions[i] = extraction
+
+    def _build(i: int) -> InvoiceResult:
+        if errors[i] is not None:
+            return _error_result(paths[i], errors[i])
+        try:
+            return _build_invoice_result(
+                paths[i], texts[i], hints[i], llm_extractions[i], use_lookup_agent, use_llm_fallback
+            )
+        except Exception as e:
+            return _error_result(paths[i], str(e))
+
+    # Remaining LLM work (fallback extraction, UOM lookup) is network-bound, so threads suffice
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_build, range(len(paths))))
+    return [_build(i) for i in range(len(paths))]
+
+
 def _process_one(
     pdf_path: Path,
     output_path: Path,
@@ -142,7 +240,7 @@ def _process_one(
     use_llm_fallback: bool,
     use_llm_primary: bool,
 ) -> InvoiceResult:
-    """Process a single PDF. Used by parallel executor."""
+    """Process a single PDF. Used by parallel executor. Never raises: failures become an error result."""
     try:
         result = process_invoice_pdf(
             pdf_path,
@@ -150,30 +248,25 @@ def _process_one(
             use_llm_fallback=use_llm_fallback,
             use_llm_primary=use_llm_primary,
         )
-        out_file = output_path / f"{pdf_path.stem}_structured.json"
-        with open(out_file, "w", encoding="utf-8") as f:
-            json.dump(result.model_dump(), f, indent=2)
-        return result
+        _write_result(result, pdf_path, output_path)
     except Exception as e:
-        result = InvoiceResult(
-            source_file=pdf_path.name,
-            supplier_name="Error",
-            line_items=[],
-            raw_metadata={"error": str(e)},
-        )
-        out_file = output_path / f"{pdf_path.stem}_structured.json"
-        with open(out_file, "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "source_file": pdf_path.name,
-                    "supplier_name": "Error",
-                    "line_items": [],
-                    "raw_metadata": {"error": str(e)},
-                },
-                f,
-                indent=2,
-            )
-        return result
+        result = _error_result(pdf_path, str(e))
+        _write_error_result(result, pdf_path, output_path)
+    return result
+
+
+def _write_result(result: InvoiceResult, pdf_path: Path, output_path: Path) -> None:
+    """Write <stem>_structured.json, serialized by pydantic-core straight from the model (no intermediate dict)."""
+    out_file = output_path / f"{pdf_path.stem}_structured.json"
+    out_file.write_text(result.model_dump_json(indent=2), encoding="utf-8")
+
+
+def _write_error_result(result: InvoiceResult, pdf_path: Path, output_path: Path) -> None:
+    """Best-effort _write_result for error results: the result is returned either way."""
+    try:
+        _write_result(result, pdf_path, output_path)
+    except Exception:
+        pass
 
 
 def run_on_folder(
@@ -183,9 +276,12 @@ def run_on_folder(
     use_llm_fallback: bool = True,
     use_llm_primary: bool = True,
     max_workers: int = 1,
+    parallel_mode: Literal["thread", "process"] = "process",
 ) -> list[InvoiceResult]:
     """Process all PDFs in input_dir and write JSON per invoice to output_dir.
-    When max_workers > 1, processes PDFs in parallel."""
+    When max_workers > 1, processes PDFs in parallel: in worker processes by default, since extraction
+    and parsing are CPU-bound and hold the GIL; parallel_mode="thread" suits LLM-heavy runs that mostly
+    wait on the network."""
     input_path = Path(input_dir)
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
@@ -204,23 +300,32 @@ def run_on_folder(
             for p in pdfs
         ]
 
-    results: list[InvoiceResult] = [None] * len(pdfs)  # type: ignore
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_idx = {
-            executor.submit(
-                _process_one, p, output_path, use_lookup_agent, use_llm_fallback, use_llm_primary
-            ): i
-            for i, p in enumerate(pdfs)
-        }
-        for future in as_completed(future_to_idx):
-            idx = future_to_idx[future]
-            try:
-                results[idx] = future.result()
-            except Exception as e:
-                results[idx] = InvoiceResult(
-                    source_file=pdfs[idx].name,
-                    supplier_name="Error",
-                    line_items=[],
-                    raw_metadata={"error": str(e)},
-                )
+    worker = partial(
+        _process_one,
+        output_path=output_path,
+        use_lookup_agent=use_lookup_agent,
+        use_llm_fallback=use_llm_fallback,
+        use_llm_primary=use_llm_primary,
+    )
+    if parallel_mode == "process":
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    # _process_one turns a failing PDF into an error result, so map() can return everything in input order;
+    # chunksize (process pools only) sends several small PDFs per round trip to a worker
+    results: list[InvoiceResult] = []
+    with executor:
+        try:
+            for result in executor.map(worker, pdfs, chunksize=max(1, len(pdfs) // (max_workers * 4))):
+                results.append(result)
+        except Exception as e:
+            # Pool-level failure (BrokenProcessPool, pickling): keep finished results, mark the rest
+            error = str(e) or type(e).__name__
+            for p in pdfs[len(results):]:
+                result = _error_result(p, error)
+                _write_error_result(result, p, output_path)
+                results.append(result)
     return results
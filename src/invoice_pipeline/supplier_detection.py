@@ -7,10 +7,11 @@ from __future__ import annotations
 import re
 from typing import Optional
 
-# Known supplier signatures (regex patterns -> normalized name)
+# Known supplier signatures (regex patterns -> normalized name), checked in order.
+# Patterns another entry already covers are left out (each costs a full-text scan):
+# magidglove.com (magid\s*glove), w.w.grainger (grainger), mscdirect (m.s.c. direct).
 SUPPLIER_SIGNATURES: list[tuple[re.Pattern, str]] = [
     (re.compile(r"magid\s*glove", re.I), "Magid Glove and Safety Manufacturing"),
-    (re.compile(r"magidglove\.com", re.I), "Magid Glove and Safety Manufacturing"),
     (re.compile(r"uline\.com", re.I), "ULINE"),
     (re.compile(r"\buline\b", re.I), "ULINE"),
     (re.compile(r"fastenal\s+company", re.I), "Fastenal"),
@@ -19,22 +20,28 @@ SUPPLIER_SIGNATURES: list[tuple[re.Pattern, str]] = [
     (re.compile(r"mcmaster", re.I), "McMaster-Carr"),
     (re.compile(r"amazon\s*business", re.I), "Amazon Business"),
     (re.compile(r"staples", re.I), "Staples"),
-    (re.compile(r"w\.?w\.?grainger", re.I), "Grainger"),
     (re.compile(r"global\s*industrial", re.I), "Global Industrial"),
-    (re.compile(r"mscdirect", re.I), "MSC Industrial"),
     (re.compile(r"m\.?s\.?c\.?\s*direct", re.I), "MSC Industrial"),
 ]
 
 
+_OCR_RUN_RE = re.compile(r"(.)\1{2,}")
+# Only repeated letters or dots can change what the signature / company-name patterns match
+_OCR_NOISE_RE = re.compile(r"([A-Za-z.])\1{2,}")
+_WS_RE = re.compile(r"\s+")
+_COMPANY_LINE_RE = re.compile(r"^[A-Za-z][a-z]+(\s+[A-Za-z][a-z]+)*\s+(Company|Inc|LLC|Corp|Ltd)\.?$")
+_REMIT_SPLIT_RE = re.compile(r"[\|\-\t:]+")
+
+
 def _normalize_supplier_name(raw: str) -> str:
     """Clean up supplier string: title case, collapse whitespace."""
-    s = re.sub(r"\s+", " ", raw.strip())
+    s = _WS_RE.sub(" ", raw.strip())
     return s.title() if s else "Unknown Supplier"
 
 
 def _ocr_normalize(text: str) -> str:
     """Collapse repeated chars for OCR noise (e.g. MMMaaagggiiiddd -> Magid)."""
-    return re.sub(r"(.)\1{2,}", r"\1", text)
+    return _OCR_RUN_RE.sub(r"\1", text)
 
 
 def detect_supplier(text: str) -> str:
@@ -42,20 +49,27 @@ def detect_supplier(text: str) -> str:
     Detect supplier from invoice text.
     Returns normalized_supplier_name (used as hint for LLM extraction).
     """
-    text_ocr = _ocr_normalize(text).lower()
-
-    for pattern, name in SUPPLIER_SIGNATURES:
-        if pattern.search(text) or pattern.search(text_ocr):
-            return _normalize_supplier_name(name)
+    # Raw text first; the OCR-normalized copy can then only contribute a higher-priority match
+    rank = next((i for i, (pattern, _) in enumerate(SUPPLIER_SIGNATURES) if pattern.search(text)), None)
+    # Without OCR-style letter runs the normalized text matches exactly what the text itself does
+    noisy = _OCR_NOISE_RE.search(text) is not None
+    if noisy and rank != 0:
+        text_ocr = _ocr_normalize(text).lower()
+        for i, (pattern, _) in enumerate(SUPPLIER_SIGNATURES[:rank]):
+            if pattern.search(text_ocr):
+                rank = i
+                break
+    if rank is not None:
+        return _normalize_supplier_name(SUPPLIER_SIGNATURES[rank][1])
 
     for line in text.split("\n")[:30]:
         line = line.strip()
-        line_ocr = _ocr_normalize(line)
-        if re.match(r"^[A-Za-z][a-z]+(\s+[A-Za-z][a-z]+)*\s+(Company|Inc|LLC|Corp|Ltd)\.?$", line_ocr):
+        line_ocr = _ocr_normalize(line) if noisy else line
+        if _COMPANY_LINE_RE.match(line_ocr):
             return _normalize_supplier_name(line_ocr)
         if "Remit" in line or "Invoice" in line:
             if "Remit" in line and "P.O." not in line[:20]:
-                for part in re.split(r"[\|\-\t:]+", line):
+                for part in _REMIT_SPLIT_RE.split(line):
                     p = part.strip()
                     if len(p) > 5 and p[0].isupper() and "P.O." not in p and "BOX" not in p:
                         return _normalize_supplier_name(p)
@@ -11,8 +11,14 @@ Policy:
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Optional
 
+try:
+    import re2
+except ImportError:  # optional: pack screening falls back to the stdlib cascade alone
+    re2 = None
+
 # --- UOM category sets ---
 
 # 1) EA-equivalent: safe, pack_qty=1
@@ -51,12 +57,31 @@ UOM_COUNT = frozenset({"COUNT", "CNT"})
 # 5) Measurable: NOT safely convertible to EA (dimension, weight, volume, time)
 UOM_MEASURABLE = frozenset({
     "FT", "IN", "M", "CM", "MM", "YD", "METER", "METRE",
-    "SF", "SQFT", "SQFT", "M2", "SQ", "SQM",
+    "SF", "SQFT", "M2", "SQ", "SQM",
     "LB", "LBS", "OZ", "KG", "G", "GRAM", "GM",
     "GAL", "GALLON", "QT", "PT", "L", "LITER", "LITRE", "ML",
     "HR", "HRS", "HOUR", "MIN", "MINUTE",
 })
 
+# A UOM belongs to exactly one category; _UOM_CATEGORY below relies on it
+_CATEGORY_SETS = (UOM_EA_SAFE, UOM_FIXED_MULT.keys(), UOM_PACK_CONTAINER, UOM_COUNT, UOM_MEASURABLE)
+assert all(a.isdisjoint(b) for i, a in enumerate(_CATEGORY_SETS) for b in _CATEGORY_SETS[i + 1:])
+
+# Canonical key -> (category, multiplier to EA, confidence when the pack is known): one probe per UOM.
+# Categories follow the policy numbering above; keys in none of the sets are unknown.
+# Multipliers are whole numbers, stored as int so they double as the default pack quantity.
+_CAT_EA, _CAT_FIXED, _CAT_PACK, _CAT_COUNT, _CAT_MEASURABLE, _CAT_UNKNOWN = range(6)
+_UOM_CATEGORY: dict[str, tuple[int, int, float]] = {
+    **{k: (_CAT_EA, 1, 1.0) for k in UOM_EA_SAFE},
+    **{k: (_CAT_FIXED, int(mult), conf) for k, (mult, conf) in UOM_FIXED_MULT.items()},
+    **{k: (_CAT_PACK, 1, 0.85) for k in UOM_PACK_CONTAINER},
+    **{k: (_CAT_COUNT, 1, 0.7) for k in UOM_COUNT},
+    **{k: (_CAT_MEASURABLE, 1, 0.0) for k in UOM_MEASURABLE},
+}
+_UNKNOWN_UOM = (_CAT_UNKNOWN, 1, 0.6)
+# Public so callers holding a uom_category() result can test it without re-normalizing the UOM
+UOM_CAT_MEASURABLE = _CAT_MEASURABLE
+
 # Normalize raw UOM string to canonical key for lookup
 UOM_ALIASES = {
     "EA": "EA", "EACH": "EA", "UNIT": "EA", "UN": "EA", "PC": "EA", "PCS": "EA", "PIECE": "EA", "ITEM": "EA",
@@ -73,8 +98,24 @@ UOM_ALIASES = {
 }
 
 
-def _normalize_uom_key(raw: str) -> Optional[str]:
+# Upper / lower / title-case spellings of every known UOM, mapped straight to their key (one dict probe)
+_UOM_KEYS_CI = {
+    spelling: key
+    for key in frozenset().union(*_CATEGORY_SETS)
+    for spelling in (key, key.lower(), key.title())
+}
+_UOM_KEYS_CI.update(
+    (spelling, key)
+    for alias, key in UOM_ALIASES.items()
+    for spelling in (alias, alias.lower(), alias.title())
+)
+
+
+def _normalize_uom_key(raw: str | None) -> Optional[str]:
     """Normalize UOM string to canonical key."""
+    key = _UOM_KEYS_CI.get(raw)
+    if key is not None:
+        return key
     r = (raw or "").strip().upper()
     if not r:
         return None
@@ -101,59 +142,88 @@ PACK_BX_CS_NUM = re.compile(r"(?:BX|CS|CT|CASE)\s*(\d+)\b", re.IGNORECASE)
 PACK_100_DISP = re.compile(r"100\s*/\s*DISP?\.?", re.IGNORECASE)
 PACK_100_BG = re.compile(r"100\s*/\s*BG\.?", re.IGNORECASE)
 
+# Every pack pattern needs at least one digit
+_DIGIT_RE = re.compile(r"\d")
+
+# Pack rules in priority order: (pattern, multiplier for its number, or the fixed pack when it has none).
+# The first pattern found anywhere in the text decides the pack.
+_PACK_RULES = (
+    (PACK_PR_DP, 2, None),
+    (PACK_PR_BG, 2, None),
+    (PACK_1_PR, 1, 2),
+    (PACK_NUM_DENOM, 1, None),
+    (PACK_PK_NUM, 1, None),
+    (PACK_DENOM_NUM, 1, None),
+    (PACK_NUM_EA, 1, None),
+    (PACK_NUM_PR, 2, None),
+    (PACK_BX_CS_NUM, 1, None),
+    (PACK_100_DISP, 1, 100),
+    (PACK_100_BG, 1, 100),
+)
+# Rules without a fixed pack read their number from group 1, so a match never needs a lastindex check
+assert all(fixed is not None or pat.groups >= 1 for pat, _, fixed in _PACK_RULES)
+_PACK_PATTERNS = tuple(pat for pat, _, _ in _PACK_RULES)
+# Everything Python's Unicode \s matches in ASCII text; ASCII-mode and RE2 \s both leave some of it out
+_ASCII_SPACE = r"[\t\n\x0b\f\r\x1c-\x1f ]"
+# Same rules for upper-cased ASCII text: no Unicode classes and no per-character case folding.
+# All pattern literals are upper case, so on ASCII text the matches are identical, and faster.
+_PACK_RULES_ASCII = tuple(
+    (re.compile(pat.pattern.replace(r"\s", _ASCII_SPACE), re.ASCII), mult, fixed)
+    for pat, mult, fixed in _PACK_RULES
+)
+
+
+def _build_pack_set():
+    """RE2 set of all pack patterns: one DFA pass tells whether any of them matches (None without re2)."""
+    if re2 is None:
+        return None
+    options = re2.Options()
+    options.case_sensitive = False
+    pack_set = re2.Set.SearchSet(options)
+    for pat in _PACK_PATTERNS:
+        pack_set.Add(pat.pattern.replace(r"\s", _ASCII_SPACE))
+    pack_set.Compile()
+    return pack_set
 
+
+_PACK_SET = _build_pack_set()
+
+
+# Same descriptions recur across lines and invoices (and are parsed again by lookup/normalize)
+@lru_cache(maxsize=8192)
 def parse_pack_from_text(text: str | None) -> Optional[int]:
     """
     Extract pack quantity from text. Returns EA-equivalent when applicable.
     Handles: 25/CS, PK10, 100PR/DP, 100/DISP, 100/BG, 1/PR, 100 PR, 100/BX, CS/1000, 1000 EA.
     """
-    if not text:
+    if not text or not _DIGIT_RE.search(text):
+        return None
+    is_ascii = text.isascii()
+    # Most descriptions carry no pack at all; RE2 rules that out in one pass. Only for ASCII text,
+    # since RE2's \d and case folding are narrower than Python's there.
+    if _PACK_SET is not None and is_ascii and not _PACK_SET.Match(text):
         return None
 
-    for pat in (PACK_PR_DP, PACK_PR_BG):
+    if is_ascii:
+        text, rules = text.upper(), _PACK_RULES_ASCII
+    else:
+        rules = _PACK_RULES
+    for pat, mult, fixed in rules:
         m = pat.search(text)
-        if m and m.lastindex >= 1:
-            return int(m.group(1)) * 2
-
-    if PACK_1_PR.search(text):
-        return 2
-
-    m = PACK_NUM_DENOM.search(text)
-    if m and m.lastindex >= 1:
-        return int(m.group(1))
-
-    m = PACK_PK_NUM.search(text)
-    if m:
-        return int(m.group(1))
-
-    m = PACK_DENOM_NUM.search(text)
-    if m:
-        return int(m.group(1))
-
-    m = PACK_NUM_EA.search(text)
-    if m:
-        return int(m.group(1))
-
-    m = PACK_NUM_PR.search(text)
-    if m:
-        return int(m.group(1)) * 2
-
-    m = PACK_BX_CS_NUM.search(text)
-    if m:
-        return int(m.group(1))
-
-    if PACK_100_DISP.search(text) or PACK_100_BG.search(text):
-        return 100
+        if m:
+            return fixed if fixed is not None else int(m.group(1)) * mult
 
     return None
 
 
 def is_measurable_uom(raw: Optional[str]) -> bool:
     """True if UOM is dimension/weight/volume/time - not convertible to EA."""
-    key = _normalize_uom_key(raw or "")
+    key = _normalize_uom_key(raw)
     return key in UOM_MEASURABLE if key else False
 
 
+# Returns a tuple of primitives, so cached results can be shared between callers
+@lru_cache(maxsize=8192)
 def normalize_uom(
     original_uom: Optional[str],
     description: Optional[str],
@@ -163,41 +233,40 @@ def normalize_uom(
     Returns (canonical_uom, pack_quantity, confidence, convertible).
     convertible=False for measurable UOMs (LB, GAL, FT, etc.) - do not compute price_per_ea.
     """
-    raw = (original_uom or "").strip().upper()
-    key = _normalize_uom_key(raw)
-    desc = (description or "").strip()
-    pack_from_desc = parse_pack_from_text(desc) or parse_pack_from_text(original_uom or "")
+    category, mult, conf = uom_category(original_uom)
 
-    # 5) Measurable UOMs - NOT convertible
-    if key and key in UOM_MEASURABLE:
+    # 5) Measurable UOMs - NOT convertible; any pack in the text is ignored, so don't parse it
+    if category == _CAT_MEASURABLE:
         return ("EA", None, 0.0, False)
 
+    desc = (description or "").strip()
+    pack_from_desc = parse_pack_from_text(desc) or parse_pack_from_text(original_uom or "")
+
     # 1) EA-equivalent
-    if key in UOM_EA_SAFE or (key == "EA"):
+    if category == _CAT_EA:
         return ("EA", pack_from_desc or 1, 1.0, True)
 
     # 2) Fixed multipliers (PR=2, DZ=12, GROSS=144)
-    if key in UOM_FIXED_MULT:
-        mult, conf = UOM_FIXED_MULT[key]
-        pack = pack_from_desc if pack_from_desc is not None else int(mult)
+    if category == _CAT_FIXED:
+        pack = pack_from_desc if pack_from_desc is not None else mult
         return ("EA", pack, conf, True)
 
-    # 3) Pack/container
-    if key in UOM_PACK_CONTAINER:
-        if pack_from_desc is not None:
-            return ("EA", pack_from_desc, 0.85, True)
-        return ("EA", None, 0.5, True)  # convertible=False effectively via escalate when pack unknown
+    # 3) Pack/container, 4) Count - treat as pack-based, and unknown UOMs
+    if pack_from_desc is not None:
+        return ("EA", pack_from_desc, conf, True)
+    # Pack unknown: convertible=False effectively via escalate
+    return ("EA", None, 0.5 if category == _CAT_PACK else 0.4, True)
 
-    # 4) Count - treat as pack-based
-    if key in UOM_COUNT:
-        if pack_from_desc is not None:
-            return ("EA", pack_from_desc, 0.7, True)
-        return ("EA", None, 0.4, True)
 
-    # Unknown
-    if pack_from_desc is not None:
-        return ("EA", pack_from_desc, 0.6, True)
-    return ("EA", None, 0.4, True)
+def clear_uom_caches() -> None:
+    """Drop memoized pack / UOM normalization results (tests, long-running services)."""
+    parse_pack_from_text.cache_clear()
+    normalize_uom.cache_clear()
+
+
+def uom_category(original_uom: Optional[str]) -> tuple[int, int, float]:
+    """(category code, multiplier to EA, confidence with known pack) for a raw UOM string."""
+    return _UOM_CATEGORY.get(_normalize_uom_key(original_uom), _UNKNOWN_UOM)
 
 
 def price_per_base_unit(
@@ -212,24 +281,32 @@ def price_per_base_unit(
     Returns (price_per_ea, conversion_unsafe).
     price_per_ea is None when UOM is not convertible (measurable) or when inputs invalid.
     """
+    category, mult, _ = uom_category(original_uom)
+    return price_per_base_unit_from_key(extended_price, quantity, category, mult, pack_quantity, convertible)
+
+
+def price_per_base_unit_from_key(
+    extended_price: Optional[float],
+    quantity: float,
+    category: int,
+    mult: int,
+    pack_quantity: Optional[int],
+    convertible: bool = True,
+) -> tuple[Optional[float], bool]:
+    """price_per_base_unit for a UOM already resolved with uom_category (category code and multiplier)."""
     if not convertible or extended_price is None or extended_price <= 0 or quantity <= 0:
         return (None, True)
 
-    raw = (original_uom or "").strip().upper()
-    key = _normalize_uom_key(raw)
     unsafe = False
 
+    # EA-equivalent, measurable and unknown UOMs count each unit as one
     base_units = quantity
     if pack_quantity is not None and pack_quantity > 0:
         base_units = quantity * pack_quantity
-    else:
-        if key in UOM_FIXED_MULT:
-            mult, _ = UOM_FIXED_MULT[key]
-            base_units = quantity * mult
-        elif key in UOM_PACK_CONTAINER or key in UOM_COUNT:
-            unsafe = True
-        elif key in UOM_EA_SAFE or key == "EA" or not key:
-            base_units = quantity
+    elif category == _CAT_FIXED:
+        base_units = quantity * mult
+    elif category == _CAT_PACK or category == _CAT_COUNT:
+        unsafe = True
 
     if base_units <= 0:
         return (None, True)
@@ -0,0 +1,77 @@
+"""UI result cache: a degraded LLM primary run must not be served from cache on the next click."""
+from __future__ import annotations
+
+import json
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.invoice_pipeline import api_client  # noqa: E402
+
+SAMPLE_PDF = next((ROOT / "Tested" / "Input").glob("*.pdf"))
+
+
+class _FailingClient:
+    """OpenAI-shaped client whose chat completions always fail, counting the attempts."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        raise RuntimeError("LLM unavailable")
+
+
+class _WorkingClient(_FailingClient):
+    """Client that answers every extraction with one line item."""
+
+    def create(self, **kwargs):
+        self.calls += 1
+        content = json.dumps({
+            "supplier_name": "Test Supplier",
+            "line_items": [{"item_description": "Widget", "quantity": 2, "unit_price": 1.5, "original_uom": "EA"}],
+        })
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _click_process_twice(client: _FailingClient) -> list[int]:
+    """Upload the sample PDF, click "Process invoices" twice; LLM call count after each click."""
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=60)
+    calls = []
+    with mock.patch.object(api_client, "get_openai_client", return_value=client):
+        at.run()
+        at.toggle[1].set_value(False)  # LLM fallback
+        at.toggle[2].set_value(False)  # agentic UOM lookup
+        at.file_uploader[0].set_value((SAMPLE_PDF.name, SAMPLE_PDF.read_bytes(), "application/pdf"))
+        at.run()
+        for _ in range(2):
+            at.button[0].click().run()
+            calls.append(client.calls)
+    assert not at.exception, at.exception
+    return calls
+
+
+class RunPipelineCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Both tests process the same upload with the same settings, i.e. the same cache key
+        st.cache_data.clear()
+
+    def test_failed_llm_primary_is_retried_on_next_run(self) -> None:
+        self.assertEqual(_click_process_twice(_FailingClient()), [1, 2])
+
+    def test_llm_primary_result_is_cached(self) -> None:
+        self.assertEqual(_click_process_twice(_WorkingClient()), [1, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()